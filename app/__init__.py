@@ -1,19 +1,32 @@
 import os
-import requests
 from flask import Flask
 from requests_oauthlib import OAuth1
+from .models import db
 from .routes import main_bp  # Make sure the Blueprint is imported
+from .utils.http_utils import scheduler
+from .utils.job_utils import JobRunner
 
-def create_app():
+def create_app(config=None):
     app = Flask(
         __name__,
         template_folder='templates'  # Changed from '../templates' to 'templates'
     )
 
+    if config:
+        app.config.update(config)
+
+    # Background job runner for long operations, enabled with JOB_RUNNER_ENABLED.
+    # Job state is kept in the configured database.
+    if app.config.get('JOB_RUNNER_ENABLED'):
+        app.config.setdefault('SQLALCHEMY_DATABASE_URI', os.environ.get(
+            'SQLALCHEMY_DATABASE_URI', 'sqlite:///wdaudiolex.db'
+        ))
+        db.init_app(app)
+        JobRunner(app)
+
     # Register the blueprint
     app.register_blueprint(main_bp)
 
-    # Other app configurations can go here (e.g., database, sessions, etc.)
     return app
 
 
@@ -39,8 +52,8 @@ def generate_csrf_token(api_url, app_key, app_secret, user_key, user_secret):
         'format': 'json'
     }
 
-    # Make a GET request to the API to fetch the CSRF token
-    response = requests.get(api_url, auth=auth, params=params)
+    # Fetch the CSRF token through the outbound scheduler
+    response = scheduler.get(api_url, auth=auth, params=params)
 
     # Check if the request was successful
     if response.status_code == 200:
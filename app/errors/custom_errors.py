@@ -1,6 +1,31 @@
+import requests
+
 
 class NotFoundError(Exception):
     def __init__(self, message):
         self.message = message
         super().__init__(self.message)
 
+
+class JobCancelledError(Exception):
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
+
+
+class JobQueueFullError(Exception):
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
+
+
+class UpstreamThrottledError(requests.RequestException):
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
+
+
+class InvalidJobParamsError(Exception):
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
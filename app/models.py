@@ -0,0 +1,77 @@
+"""
+Models Module
+
+This module defines the database models for the WDAudioLEx application.
+The SQLAlchemy instance is created here and bound to the app in create_app.
+"""
+
+import json
+from datetime import datetime, timezone
+
+from flask_sqlalchemy import SQLAlchemy
+
+db = SQLAlchemy()
+
+
+def utcnow():
+    """Current UTC time as a naive datetime, as stored by the database."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class Job(db.Model):
+    """
+    A background job and its persisted state.
+
+    Jobs are executed by the in-process job runner; this table lets clients
+    poll their progress and keeps the final state around across restarts.
+    """
+
+    __tablename__ = 'jobs'
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+    INTERRUPTED = 'interrupted'
+
+    FINISHED_STATES = (COMPLETED, FAILED, CANCELLED, INTERRUPTED)
+
+    id = db.Column(db.String(36), primary_key=True)
+    job_type = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.String(16), nullable=False, default=QUEUED)
+    progress = db.Column(db.Float, nullable=False, default=0.0)
+    params = db.Column(db.Text, nullable=False, default='{}')
+    result = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    # Worker process executing the job ("<hostname>:<pid>") and its last sign of life
+    owner = db.Column(db.String(255), nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=utcnow, onupdate=utcnow)
+
+    @property
+    def is_finished(self):
+        return self.status in self.FINISHED_STATES
+
+    def to_dict(self):
+        """
+        Serialize the job for the polling API.
+
+        Returns:
+            dict: Job ID, type, status, progress (0.0 - 1.0), parameters,
+            the latest (partial or final) result and any error message.
+        """
+        return {
+            "id": self.id,
+            "type": self.job_type,
+            "status": self.status,
+            "progress": self.progress,
+            "params": json.loads(self.params or '{}'),
+            "result": json.loads(self.result) if self.result is not None else None,
+            "error": self.error,
+            "cancel_requested": self.cancel_requested,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
@@ -1,6 +1,9 @@
 from flask import Blueprint, render_template, current_app, jsonify, request
 from app.utils.language_utils import get_supported_languages
-from app.utils.lexeme_utils import search_lexemes
+from app.utils.lexeme_utils import SEARCH_INCLUDES, search_lexemes
+from app.utils.job_utils import get_job_runner
+from app.utils.http_utils import scheduler
+from app.errors.custom_errors import InvalidJobParamsError, JobQueueFullError, NotFoundError
 
 """
 Routes Module
@@ -71,6 +74,8 @@ def search_lexemes_route():
     
     Query Parameters:
         word (str): The word to search for in Wikidata
+        include (str, optional): Comma-separated extra data per lexeme,
+            any of "forms" and "audio"
         
     Returns:
         JSON response containing:
@@ -80,7 +85,8 @@ def search_lexemes_route():
                     "lemma": "example",
                     "language": "English"
                 }
-            - Error (400): Error message if word parameter is missing:
+            - Error (400): Error message if word parameter is missing
+              or include has an unknown value:
                 {
                     "error": "Word parameter is required"
                 }
@@ -95,6 +101,25 @@ def search_lexemes_route():
                     "language": "English"
                 }
             ]
+
+        GET /api/search-lexemes?word=hello&include=forms,audio
+        Response:
+            [
+                {
+                    "id": "L123",
+                    "lemma": "hello",
+                    "language": "English",
+                    "forms": [
+                        {
+                            "form_id": "L123-F1",
+                            "representations": {"en": {"language": "en", "value": "hello"}},
+                            "grammatical_features": [],
+                            "statements": {...}
+                        }
+                    ],
+                    "audio": {"L123-F1": ["LL-Q1860 (eng)-Jane-hello.wav"]}
+                }
+            ]
     """
     # Get the search word from query parameters
     word = request.args.get('word')
@@ -102,7 +127,131 @@ def search_lexemes_route():
     # Validate input
     if not word:
         return jsonify({"error": "Word parameter is required"}), 400
+
+    include = [value.strip() for value in request.args.get('include', '').split(',') if value.strip()]
+    unknown = [value for value in include if value not in SEARCH_INCLUDES]
+    if unknown:
+        return jsonify({"error": f"Unknown include value: {', '.join(unknown)}"}), 400
         
     # Search for matching lexemes
-    results = search_lexemes(word)
+    results = search_lexemes(word, include)
     return jsonify(results)
+
+
+@main_bp.route('/api/jobs', methods=['POST'])
+def submit_job_route():
+    """
+    Submit a long-running operation as a background job.
+
+    Request Body (JSON):
+        type (str): A registered job type (e.g. "category-scan")
+        params (dict): Keyword arguments for the job
+
+    Returns:
+        JSON response containing:
+            - Accepted (202): The created job, with a Location header
+              pointing at its polling URL
+            - Error (400): If the job type is missing or unknown, or the
+              params do not fit the job type
+            - Error (503): If too many jobs are already pending or
+              background jobs are disabled
+
+    Example:
+        POST /api/jobs
+        {"type": "category-scan", "params": {"categories": ["Lingua Libre pronunciation-eng"]}}
+    """
+    payload = request.get_json(silent=True) or {}
+    job_type = payload.get('type')
+    params = payload.get('params') or {}
+
+    if not job_type:
+        return jsonify({"error": "Job type is required"}), 400
+    if not isinstance(params, dict):
+        return jsonify({"error": "Job params must be an object"}), 400
+
+    runner = get_job_runner(current_app)
+    if runner is None:
+        return jsonify({"error": "Background jobs are disabled"}), 503
+
+    try:
+        job = runner.submit(job_type, params)
+    except (NotFoundError, InvalidJobParamsError) as e:
+        return jsonify({"error": str(e)}), 400
+    except JobQueueFullError as e:
+        return jsonify({"error": str(e)}), 503
+
+    return jsonify(job.to_dict()), 202, {"Location": f"/api/jobs/{job.id}"}
+
+
+@main_bp.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_route(job_id):
+    """
+    Poll the status, progress and (partial) result of a background job.
+
+    Returns:
+        JSON response containing:
+            - Success (200): The job with properties:
+                {
+                    "id": "0b8f...",
+                    "type": "category-scan",
+                    "status": "running",
+                    "progress": 0.5,
+                    "result": {...},
+                    "error": null
+                }
+            - Error (404): If the job does not exist
+    """
+    runner = get_job_runner(current_app)
+    if runner is None:
+        return jsonify({"error": "Background jobs are disabled"}), 503
+
+    try:
+        job = runner.get(job_id)
+    except NotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    return jsonify(job.to_dict())
+
+
+@main_bp.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job_route(job_id):
+    """
+    Cancel a background job.
+
+    Queued jobs are cancelled immediately, running jobs stop at their next
+    progress update.
+
+    Returns:
+        JSON response containing:
+            - Success (200): The job after the cancellation request
+            - Error (404): If the job does not exist
+    """
+    runner = get_job_runner(current_app)
+    if runner is None:
+        return jsonify({"error": "Background jobs are disabled"}), 503
+
+    try:
+        job = runner.cancel(job_id)
+    except NotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    return jsonify(job.to_dict())
+
+
+@main_bp.route('/api/metrics/outbound', methods=['GET'])
+def outbound_metrics_route():
+    """
+    Get metrics of the outbound request scheduler.
+
+    Returns:
+        JSON response mapping each upstream host to:
+            {
+                "queue_depth": {"interactive": 0, "background": 2},
+                "requests": 120,
+                "throttled": 1,
+                "rejected": 0,
+                "average_wait": 0.05,
+                "max_wait": 1.2,
+                "rate": 2.0,
+                "paused_for": 0.0
+            }
+    """
+    return jsonify(scheduler.metrics())
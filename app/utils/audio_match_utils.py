@@ -0,0 +1,197 @@
+"""
+Audio Match Utilities Module
+
+This module matches Lingua Libre audio files on Wikimedia Commons to lexeme
+forms that do not have a pronunciation audio (P443) statement yet.
+
+Lingua Libre files are named ``LL-Q<lang> (<iso>)-<user>-<word>.wav``. The
+matcher builds a hash index of these files keyed on (language, normalized word)
+and joins the forms against it, so that matching is linear in the number of
+files and forms instead of comparing every form with every file.
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from app.utils.lexeme_utils import PRONUNCIATION_AUDIO_PROPERTY
+
+# LL-Q<lang> (<iso>)-<user>-<word>.<ext>
+# The user name is taken up to the first hyphen; since user names may contain
+# hyphens too, the other splits are tried by the matcher (see _candidate_words)
+LINGUA_LIBRE_PATTERN = re.compile(
+    r'^LL-(?P<qid>Q\d+) \((?P<iso>[^)]+)\)-(?P<user>[^-]+)-(?P<word>.+)\.(?P<ext>[A-Za-z0-9]+)$'
+)
+
+IndexKey = Tuple[str, str]
+
+
+def normalize_representation(text: str) -> str:
+    """
+    Normalize a written word into a matching key.
+
+    Applies Unicode NFC normalization and lowercasing, and collapses
+    underscores (as in Commons file names) and runs of whitespace into single
+    spaces. Unlike sanitize_word, punctuation and combining marks are kept, so
+    that words such as "नमस्ते" and "नमस्त" or "well-being" and "wellbeing"
+    stay distinct. Full case folding is avoided as it merges distinct words
+    such as "Maße" and "Masse".
+
+    Example:
+        >>> normalize_representation("Bonjour_ le  monde")
+        'bonjour le monde'
+    """
+    text = unicodedata.normalize('NFC', text).lower().replace('_', ' ')
+    return ' '.join(text.split())
+
+
+def parse_lingua_libre_filename(filename: str) -> Optional[Dict[str, str]]:
+    """
+    Split a Lingua Libre file name into its parts.
+
+    Args:
+        filename (str): File name, with or without the "File:" prefix
+
+    Returns:
+        Optional[Dict[str, str]]: The keys qid, iso, user, word and file, or
+        None if the name does not follow the Lingua Libre convention
+
+    The file name does not tell hyphens in the user name from hyphens in
+    the word, so "LL-Q188 (deu)-Jan-Luc-Weg.wav" is parsed as user "Jan"
+    and word "Luc-Weg".
+
+    Example:
+        >>> parse_lingua_libre_filename("LL-Q150 (fra)-Poslovitch-bonjour.wav")
+        {'qid': 'Q150', 'iso': 'fra', 'user': 'Poslovitch', 'word': 'bonjour', 'file': 'LL-Q150 (fra)-Poslovitch-bonjour.wav'}
+    """
+    if filename.startswith('File:'):
+        filename = filename[len('File:'):]
+    filename = filename.replace('_', ' ')
+
+    match = LINGUA_LIBRE_PATTERN.match(filename)
+    if not match:
+        return None
+    return {
+        "qid": match.group('qid'),
+        "iso": match.group('iso'),
+        "user": match.group('user'),
+        "word": match.group('word'),
+        "file": filename,
+    }
+
+
+def _candidate_words(parsed: Dict[str, str]) -> List[str]:
+    # Every "<user>-<word>" split of the file name, longest word first
+    parts = f'{parsed["user"]}-{parsed["word"]}'.split('-')
+    words = (normalize_representation('-'.join(parts[i:])) for i in range(1, len(parts)))
+    return list(dict.fromkeys(word for word in words if word))
+
+
+def build_audio_index(files: Iterable[Union[Dict, str]]) -> Dict[IndexKey, List[str]]:
+    """
+    Build a hash index of Lingua Libre files.
+
+    A file whose user name and word are separated ambiguously, as in
+    "LL-Q188 (deu)-Jan-Luc-Weg.wav", is indexed under every possible word
+    ("luc-weg" and "weg"); propose_pronunciation_links resolves which one
+    is meant.
+
+    Args:
+        files: File entries as returned by fetch_audio_files_from_category
+            (dicts with a "file" key) or plain file names
+
+    Returns:
+        Dict[Tuple[str, str], List[str]]: File names keyed on
+        (language item ID, normalized word); files that do not follow the
+        naming convention are skipped
+    """
+    index = defaultdict(list)
+    for entry in files:
+        filename = entry.get('file') if isinstance(entry, dict) else entry
+        if not filename:
+            continue
+        parsed = parse_lingua_libre_filename(filename)
+        if parsed is None:
+            continue
+
+        for word in _candidate_words(parsed):
+            index[(parsed["qid"], word)].append(parsed["file"])
+    return dict(index)
+
+
+def _representation_values(representations: Dict) -> Iterable[Tuple[str, str]]:
+    # Representations are either {code: text} or Wikibase {code: {"language": code, "value": text}}
+    for code, value in representations.items():
+        if isinstance(value, dict):
+            value = value.get("value")
+        if value:
+            yield code, value
+
+
+def propose_pronunciation_links(
+    lexeme_forms: Dict[str, List[Dict]],
+    audio_index: Dict[IndexKey, List[str]],
+    lexeme_languages: Dict[str, str]
+) -> List[Dict]:
+    """
+    Propose P443 audio files for forms that have no pronunciation audio yet.
+
+    A file indexed under several words is only proposed for the longest one
+    that is the representation of any given form, i.e. the user name is
+    assumed to contain as few hyphens as possible.
+
+    Args:
+        lexeme_forms: Forms per lexeme, as returned by get_lexeme_forms
+        audio_index: Index built by build_audio_index
+        lexeme_languages: Language item ID (e.g. "Q150") per lexeme ID, as
+            given by the "language" field of wbgetentities. Lexemes without
+            a language are skipped, since Lingua Libre file names use
+            ISO 639-3 codes that do not match representation codes.
+
+    Returns:
+        List[Dict]: One proposal per matched form and representation:
+            - lexeme_id: The lexeme ID (e.g. "L123")
+            - form_id: The form ID (e.g. "L123-F1")
+            - language: The representation language code
+            - representation: The written representation
+            - files: Matching Commons file names
+    """
+    form_keys = {
+        (lexeme_languages[lexeme_id], normalize_representation(text))
+        for lexeme_id, forms in lexeme_forms.items() if lexeme_languages.get(lexeme_id)
+        for form in forms
+        for _, text in _representation_values(form.get("representations", {}))
+    }
+    resolved = {}
+
+    def resolve(filename: str) -> Optional[IndexKey]:
+        # The key of the longest candidate word that matches a form
+        if filename not in resolved:
+            parsed = parse_lingua_libre_filename(filename)
+            keys = ((parsed["qid"], word) for word in _candidate_words(parsed))
+            resolved[filename] = next((key for key in keys if key in form_keys), None)
+        return resolved[filename]
+
+    proposals = []
+
+    for lexeme_id, forms in lexeme_forms.items():
+        lexeme_language = lexeme_languages.get(lexeme_id)
+        if not lexeme_language:
+            continue
+        for form in forms:
+            if form.get("statements", {}).get(PRONUNCIATION_AUDIO_PROPERTY):
+                continue
+
+            for code, text in _representation_values(form.get("representations", {})):
+                key = (lexeme_language, normalize_representation(text))
+                files = [file for file in audio_index.get(key, []) if resolve(file) == key]
+                if files:
+                    proposals.append({
+                        "lexeme_id": lexeme_id,
+                        "form_id": form.get("form_id"),
+                        "language": code,
+                        "representation": text,
+                        "files": files,
+                    })
+    return proposals
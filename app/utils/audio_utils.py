@@ -0,0 +1,381 @@
+"""
+Audio Utilities Module
+
+This module preprocesses PCM WAV recordings before they are uploaded to
+Wikimedia Commons. Leading and trailing silence is trimmed, the loudness is
+normalized and the audio is downmixed and resampled to a target format.
+
+Files are streamed in fixed-size blocks of NumPy arrays, so memory use does
+not grow with the length of a recording. Batches of files are processed in a
+process pool.
+"""
+
+import multiprocessing
+import os
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# Number of frames decoded per block
+BLOCK_FRAMES = 65536
+
+# Length of the windows used for silence detection, in seconds
+WINDOW_SECONDS = 0.01
+
+# Silence kept around the detected speech, in seconds
+PADDING_SECONDS = 0.05
+
+DEFAULT_SILENCE_THRESHOLD_DB = -45.0
+DEFAULT_PEAK_DB = -1.0
+DEFAULT_RMS_DB = -20.0
+
+# Anti-alias filter cutoff as a fraction of the target Nyquist frequency
+ANTI_ALIAS_CUTOFF = 0.9
+
+
+def _db_to_amplitude(db: float) -> float:
+    return 10.0 ** (db / 20.0)
+
+
+def _decode(raw: bytes, sample_width: int, channels: int) -> np.ndarray:
+    """Decode PCM bytes into a float32 array of shape (frames, channels) in [-1, 1]."""
+    if sample_width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768.0
+    elif sample_width == 3:
+        # Widen little-endian 24-bit samples to 32-bit by appending a zero low byte
+        bytes24 = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        widened = np.zeros((len(bytes24), 4), dtype=np.uint8)
+        widened[:, 1:] = bytes24
+        samples = widened.view('<i4').ravel().astype(np.float32) / 2147483648.0
+    elif sample_width == 4:
+        samples = np.frombuffer(raw, dtype='<i4').astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported sample width: {sample_width} bytes")
+    return samples.reshape(-1, channels)
+
+
+def _open_wav(path: str) -> wave.Wave_read:
+    """Open a PCM WAV file for reading, raising ValueError if it is not supported."""
+    try:
+        return wave.open(path, 'rb')
+    except (wave.Error, EOFError) as e:
+        raise ValueError(f"Unsupported WAV file {path}: {e}") from e
+
+
+def read_blocks(path: str, block_frames: int = BLOCK_FRAMES,
+                start: int = 0, stop: Optional[int] = None) -> Iterator[np.ndarray]:
+    """
+    Stream a PCM WAV file as float32 blocks of shape (frames, channels).
+
+    Args:
+        path (str): Path to the WAV file
+        block_frames (int): Maximum number of frames per block
+        start (int): First frame to read
+        stop (int, optional): Frame to stop before, defaults to the end of the file
+    """
+    with _open_wav(path) as wav:
+        channels = wav.getnchannels()
+        sample_width = wav.getsampwidth()
+        stop = wav.getnframes() if stop is None else min(stop, wav.getnframes())
+        wav.setpos(start)
+        position = start
+        while position < stop:
+            raw = wav.readframes(min(block_frames, stop - position))
+            if not raw:
+                break
+            block = _decode(raw, sample_width, channels)
+            position += len(block)
+            yield block
+
+
+def _prepare(block: np.ndarray, mono: bool) -> np.ndarray:
+    return block.mean(axis=1, keepdims=True) if mono else block
+
+
+def analyze(path: str, threshold_db: float = DEFAULT_SILENCE_THRESHOLD_DB,
+            mono: bool = True) -> Dict:
+    """
+    Find the non-silent region of a WAV file and its loudness.
+
+    The file is split into short windows whose mean energy is compared with
+    the silence threshold; the first and last windows above it delimit the
+    region that is kept.
+
+    Args:
+        path (str): Path to the WAV file
+        threshold_db (float): Windows quieter than this (dBFS RMS) count as silence
+        mono (bool): Measure the downmixed signal
+
+    Returns:
+        Dict: Analysis with the keys:
+            - rate: Sample rate of the file
+            - frames: Total number of frames
+            - start, stop: Frame range of the non-silent region (empty if
+              the whole file is silent)
+            - peak: Peak amplitude within the region
+            - rms: RMS amplitude within the region
+    """
+    with _open_wav(path) as wav:
+        rate = wav.getframerate()
+        frames = wav.getnframes()
+
+    window = max(1, int(rate * WINDOW_SECONDS))
+    # Keep blocks aligned to whole windows
+    block_frames = max(window, BLOCK_FRAMES // window * window)
+
+    energies, peaks, counts = [], [], []
+    for block in read_blocks(path, block_frames):
+        block = _prepare(block, mono)
+        windows = -(-len(block) // window)
+        padded = np.zeros((windows * window, block.shape[1]), dtype=np.float32)
+        padded[:len(block)] = block
+        padded = padded.reshape(windows, window * block.shape[1])
+        energies.append(np.square(padded, dtype=np.float64).sum(axis=1))
+        peaks.append(np.abs(padded).max(axis=1))
+        sizes = np.full(windows, window)
+        sizes[-1] = len(block) - (windows - 1) * window
+        counts.append(sizes * block.shape[1])
+
+    if not energies:
+        return {"rate": rate, "frames": frames, "start": 0, "stop": 0, "peak": 0.0, "rms": 0.0}
+
+    energies = np.concatenate(energies)
+    peaks = np.concatenate(peaks)
+    counts = np.concatenate(counts)
+
+    loud = np.flatnonzero(energies / counts >= _db_to_amplitude(threshold_db) ** 2)
+    if len(loud) == 0:
+        return {"rate": rate, "frames": frames, "start": 0, "stop": 0, "peak": 0.0, "rms": 0.0}
+
+    first, last = loud[0], loud[-1] + 1
+    padding = int(rate * PADDING_SECONDS)
+    return {
+        "rate": rate,
+        "frames": frames,
+        "start": max(0, first * window - padding),
+        "stop": min(frames, last * window + padding),
+        "peak": float(peaks[first:last].max()),
+        "rms": float(np.sqrt(energies[first:last].sum() / counts[first:last].sum())),
+    }
+
+
+def _lowpass_taps(cutoff: float, taps: int) -> np.ndarray:
+    """Blackman-windowed sinc low-pass filter; cutoff in cycles per sample."""
+    n = np.arange(taps) - (taps - 1) / 2
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.blackman(taps)
+    return kernel / kernel.sum()
+
+
+class _StreamingResampler:
+    """
+    Resampler that works across block boundaries.
+
+    When downsampling, the input is first low-pass filtered below the target
+    Nyquist frequency with a windowed-sinc FIR filter, so that higher
+    frequencies do not alias. The filter history and the last input frame are
+    carried between blocks, and linear interpolation picks the output frames.
+    Call ``flush`` after the last block to emit the filter tail.
+    """
+
+    def __init__(self, source_rate: int, target_rate: int):
+        self.step = source_rate / target_rate
+        self.consumed = 0
+        self.next_output = 0
+        self.carry = None
+
+        self.taps = None
+        self.history = None
+        self.delay = 0
+        if self.step > 1:
+            # Longer filters for larger ratios keep the transition band narrow
+            self.taps = _lowpass_taps(ANTI_ALIAS_CUTOFF * 0.5 / self.step,
+                                      2 * int(np.ceil(32 * self.step)) + 1)
+            self.delay = (len(self.taps) - 1) // 2
+
+    def _filter(self, block: np.ndarray) -> np.ndarray:
+        if self.taps is None:
+            return block
+        if self.history is None:
+            self.history = np.zeros((len(self.taps) - 1, block.shape[1]), dtype=np.float32)
+        data = np.concatenate([self.history, block])
+        self.history = data[len(block):]
+        filtered = np.stack(
+            [np.convolve(data[:, channel], self.taps, mode='valid') for channel in range(data.shape[1])],
+            axis=1
+        )
+        # Drop the filter's group delay at the start of the stream
+        drop = min(self.delay, len(filtered))
+        self.delay -= drop
+        return filtered[drop:]
+
+    def _interpolate(self, block: np.ndarray) -> np.ndarray:
+        if len(block) == 0:
+            return block.astype(np.float32)
+        if self.carry is not None:
+            block = np.concatenate([self.carry, block])
+            first = self.consumed - 1
+        else:
+            first = self.consumed
+        last = first + len(block) - 1
+        self.consumed = last + 1
+        self.carry = block[-1:]
+
+        # Output frames whose position lies within this block
+        count = max(0, int(np.floor(last / self.step)) + 1 - self.next_output)
+        positions = (self.next_output + np.arange(count)) * self.step
+        self.next_output += count
+
+        source = np.arange(first, last + 1)
+        return np.stack(
+            [np.interp(positions, source, block[:, channel]) for channel in range(block.shape[1])],
+            axis=1
+        ).astype(np.float32)
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        if self.step == 1:
+            return block
+        return self._interpolate(self._filter(block))
+
+    def flush(self) -> np.ndarray:
+        if self.history is None:
+            return np.zeros((0, 1), dtype=np.float32)
+        tail = (len(self.taps) - 1) // 2
+        return self.process(np.zeros((tail, self.history.shape[1]), dtype=np.float32))
+
+
+def _write(out: wave.Wave_write, frames: np.ndarray, gain: float) -> int:
+    """Apply the gain and write frames as 16-bit PCM; returns the number of frames."""
+    frames = np.clip(frames * gain, -1.0, 32767 / 32768)
+    out.writeframes((frames * 32768).astype('<i2').tobytes())
+    return len(frames)
+
+
+def preprocess_wav(input_path: str, output_path: str,
+                   target_rate: Optional[int] = None,
+                   mono: bool = True,
+                   normalize: str = 'peak',
+                   target_db: Optional[float] = None,
+                   threshold_db: float = DEFAULT_SILENCE_THRESHOLD_DB) -> Dict:
+    """
+    Trim, normalize, downmix and resample a PCM WAV file.
+
+    The output is written as 16-bit PCM WAV. Input is read twice in blocks:
+    once to find the non-silent region and its loudness, once to write it.
+
+    Args:
+        input_path (str): Path of the recording
+        output_path (str): Path the processed WAV is written to
+        target_rate (int, optional): Maximum output sample rate. Recordings
+            are only ever downsampled; None keeps the input rate
+        mono (bool): Downmix all channels to one
+        normalize (str): "peak", "rms" or None to keep the level
+        target_db (float, optional): Target level in dBFS, defaults to
+            DEFAULT_PEAK_DB or DEFAULT_RMS_DB
+        threshold_db (float): Silence threshold in dBFS
+
+    Returns:
+        Dict: Summary with input and output durations and the applied gain
+
+    Raises:
+        ValueError: If the file is not a supported PCM WAV file, contains
+            only silence, or the normalization mode is unknown
+    """
+    if normalize not in ('peak', 'rms', None):
+        raise ValueError(f"Unknown normalization mode: {normalize}")
+
+    start_time = time.perf_counter()
+    info = analyze(input_path, threshold_db, mono)
+    if info["start"] == info["stop"]:
+        raise ValueError(f"No audio above {threshold_db} dBFS in {input_path}")
+
+    gain = 1.0
+    if normalize == 'peak':
+        gain = _db_to_amplitude(DEFAULT_PEAK_DB if target_db is None else target_db) / info["peak"]
+    elif normalize == 'rms':
+        gain = _db_to_amplitude(DEFAULT_RMS_DB if target_db is None else target_db) / info["rms"]
+        # Never raise the level so far that the signal clips
+        gain = min(gain, 1.0 / info["peak"])
+
+    with _open_wav(input_path) as wav:
+        channels = 1 if mono else wav.getnchannels()
+    # Upsampling would only make the upload larger
+    rate = min(target_rate, info["rate"]) if target_rate else info["rate"]
+    resampler = _StreamingResampler(info["rate"], rate)
+
+    output_frames = 0
+    with wave.open(output_path, 'wb') as out:
+        out.setnchannels(channels)
+        out.setsampwidth(2)
+        out.setframerate(rate)
+
+        for block in read_blocks(input_path, BLOCK_FRAMES, info["start"], info["stop"]):
+            output_frames += _write(out, resampler.process(_prepare(block, mono)), gain)
+        output_frames += _write(out, resampler.flush(), gain)
+
+    return {
+        "input": input_path,
+        "output": output_path,
+        "input_seconds": info["frames"] / info["rate"],
+        "output_seconds": output_frames / rate,
+        "trimmed_seconds": (info["frames"] - (info["stop"] - info["start"])) / info["rate"],
+        "gain_db": float(20 * np.log10(gain)),
+        "elapsed": time.perf_counter() - start_time,
+    }
+
+
+def _preprocess_job(args: Tuple[str, str, Dict]) -> Dict:
+    input_path, output_path, options = args
+    try:
+        return preprocess_wav(input_path, output_path, **options)
+    except (OSError, EOFError, ValueError) as e:
+        # Report the file instead of aborting the rest of the batch
+        return {"input": input_path, "output": output_path, "error": str(e)}
+
+
+def preprocess_batch(files: List[Tuple[str, str]], workers: Optional[int] = None,
+                     **options) -> Dict:
+    """
+    Preprocess several WAV files in a process pool.
+
+    Args:
+        files (List[Tuple[str, str]]): (input path, output path) pairs
+        workers (int, optional): Number of processes, defaults to the CPU count
+        **options: Passed on to preprocess_wav
+
+    Returns:
+        Dict: Batch report with the keys:
+            - results: The preprocess_wav summary of each file, or its input,
+              output and "error" if the file could not be processed
+            - failed: Number of files that could not be processed
+            - workers: Number of processes used
+            - wall_seconds: Elapsed time of the batch
+            - audio_seconds: Total duration of the successfully processed input audio
+            - audio_seconds_per_core: Input audio processed per second and core
+    """
+    workers = workers or os.cpu_count() or 1
+    start_time = time.perf_counter()
+
+    # Spawn rather than fork: this may be called from threads of the Flask process
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context('spawn')) as executor:
+        results = list(executor.map(
+            _preprocess_job, [(source, target, options) for source, target in files]
+        ))
+
+    wall_seconds = time.perf_counter() - start_time
+    processed = [result for result in results if "error" not in result]
+    audio_seconds = sum(result["input_seconds"] for result in processed)
+    used = min(workers, len(files)) or 1
+    return {
+        "results": results,
+        "failed": len(results) - len(processed),
+        "workers": used,
+        "wall_seconds": wall_seconds,
+        "audio_seconds": audio_seconds,
+        "audio_seconds_per_core": audio_seconds / wall_seconds / used if wall_seconds else 0.0,
+    }
@@ -0,0 +1,318 @@
+"""
+HTTP Utilities Module
+
+This module provides a central scheduler for outbound requests to Wikimedia
+services (Wikidata Query Service, MediaWiki APIs).
+
+Every upstream host gets its own token bucket. Requests are tagged with a
+priority class so that interactive requests are served before background
+work, and the scheduler backs off when an upstream answers with HTTP 429/503
+or a MediaWiki ``maxlag`` error.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+from app.errors.custom_errors import UpstreamThrottledError
+
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+PRIORITIES = (INTERACTIVE, BACKGROUND)
+
+# Requests per second and burst size per upstream host
+DEFAULT_RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    "query.wikidata.org": (2.0, 5),
+    "www.wikidata.org": (5.0, 10),
+    "commons.wikimedia.org": (5.0, 10),
+    "test-commons.wikimedia.org": (5.0, 10),
+}
+FALLBACK_RATE_LIMIT: Tuple[float, int] = (5.0, 10)
+
+# maxlag value sent with background MediaWiki API requests
+DEFAULT_MAXLAG = 5
+
+# Longest time interactive requests wait for an upstream, in seconds
+INTERACTIVE_MAX_WAIT = 5.0
+
+# Methods that are safe to resend after a throttled response
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# The adaptive rate never drops below this fraction of the configured rate
+MIN_RATE_FACTOR = 0.1
+
+_current_priority: ContextVar[str] = ContextVar('outbound_priority', default=INTERACTIVE)
+
+
+def current_priority() -> str:
+    """Return the priority class of outbound requests made in this context."""
+    return _current_priority.get()
+
+
+@contextmanager
+def request_priority(priority: str):
+    """
+    Make outbound requests within the block use the given priority class.
+
+    Example:
+        >>> with request_priority(BACKGROUND):
+        ...     search_lexemes("hello")
+    """
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at ``rate`` tokens per second up to ``capacity``.
+
+    Not thread-safe on its own; the scheduler guards it with the upstream lock.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until_token(self, now: float) -> float:
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self, now: float):
+        self._refill(now)
+        self.tokens -= 1
+
+
+class _Upstream:
+    def __init__(self, rate: float, capacity: int):
+        self.base_rate = rate
+        self.bucket = TokenBucket(rate, capacity)
+        self.condition = threading.Condition()
+        self.paused_until = 0.0
+        self.waiting = {priority: 0 for priority in PRIORITIES}
+        self.requests = 0
+        self.throttled = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+
+class OutboundScheduler:
+    """
+    Rate-limit-aware scheduler for outbound HTTP requests.
+
+    Args:
+        rate_limits (dict, optional): (requests per second, burst) per host
+        max_retries (int): How often a throttled request is retried
+    """
+
+    def __init__(self, rate_limits: Optional[Dict[str, Tuple[float, int]]] = None,
+                 max_retries: int = 3):
+        self.rate_limits = dict(DEFAULT_RATE_LIMITS if rate_limits is None else rate_limits)
+        self.max_retries = max_retries
+        self._upstreams: Dict[str, _Upstream] = {}
+        self._lock = threading.Lock()
+
+    def _upstream(self, host: str) -> _Upstream:
+        with self._lock:
+            upstream = self._upstreams.get(host)
+            if upstream is None:
+                rate, capacity = self.rate_limits.get(host, FALLBACK_RATE_LIMIT)
+                upstream = self._upstreams[host] = _Upstream(rate, capacity)
+            return upstream
+
+    def acquire(self, host: str, priority: Optional[str] = None,
+                deadline: Optional[float] = None) -> float:
+        """
+        Block until a request to the host may be sent.
+
+        Background requests wait while interactive requests are queued for
+        the same host.
+
+        Args:
+            host (str): Upstream host
+            priority (str, optional): INTERACTIVE or BACKGROUND
+            deadline (float, optional): time.monotonic() value after which
+                the request may not be sent
+
+        Returns:
+            float: Seconds spent waiting
+
+        Raises:
+            UpstreamThrottledError: If the request could not be sent before the deadline
+        """
+        priority = priority or current_priority()
+        upstream = self._upstream(host)
+        start = time.monotonic()
+
+        with upstream.condition:
+            upstream.waiting[priority] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    if priority == BACKGROUND and upstream.waiting[INTERACTIVE]:
+                        if deadline is not None and now >= deadline:
+                            upstream.rejected += 1
+                            raise UpstreamThrottledError(f"{host} is busy, try again later")
+                        upstream.condition.wait(deadline - now if deadline is not None else None)
+                        continue
+                    delay = max(upstream.paused_until - now, upstream.bucket.time_until_token(now))
+                    if delay <= 0:
+                        upstream.bucket.consume(now)
+                        break
+                    if deadline is not None and now + delay > deadline:
+                        upstream.rejected += 1
+                        raise UpstreamThrottledError(f"{host} is throttled, try again later")
+                    upstream.condition.wait(delay)
+            finally:
+                upstream.waiting[priority] -= 1
+                upstream.condition.notify_all()
+
+            waited = time.monotonic() - start
+            upstream.requests += 1
+            upstream.total_wait += waited
+            upstream.max_wait = max(upstream.max_wait, waited)
+        return waited
+
+    def _throttle(self, host: str, retry_after: float):
+        # Multiplicative decrease: pause the upstream and halve its rate
+        upstream = self._upstream(host)
+        with upstream.condition:
+            upstream.throttled += 1
+            upstream.paused_until = max(upstream.paused_until, time.monotonic() + retry_after)
+            upstream.bucket.rate = max(upstream.base_rate * MIN_RATE_FACTOR, upstream.bucket.rate / 2)
+            upstream.condition.notify_all()
+
+    def _recover(self, host: str):
+        # Additive increase back towards the configured rate
+        upstream = self._upstream(host)
+        with upstream.condition:
+            if upstream.bucket.rate < upstream.base_rate:
+                upstream.bucket.rate = min(upstream.base_rate,
+                                           upstream.bucket.rate + upstream.base_rate * MIN_RATE_FACTOR)
+
+    @staticmethod
+    def _retry_after(response, attempt: int) -> Optional[float]:
+        """
+        Return the back-off delay if the response signals throttling, else None.
+        """
+        is_maxlag = 'X-Database-Lag' in response.headers
+        if response.status_code not in (429, 503) and not is_maxlag:
+            return None
+        try:
+            return max(0.0, float(response.headers['Retry-After']))
+        except (KeyError, TypeError, ValueError):
+            return float(2 ** attempt)
+
+    def request(self, method: str, url: str, priority: Optional[str] = None,
+                maxlag: Optional[int] = None, max_wait: Optional[float] = None, **kwargs):
+        """
+        Send a request through the scheduler.
+
+        Throttled responses (HTTP 429/503 or a MediaWiki maxlag error) are
+        retried after the Retry-After delay, up to max_retries times; the last
+        response is returned if the upstream keeps throttling. Requests that
+        are not idempotent, such as POST, are only retried after a maxlag
+        error, since those are rejected before any change is made. A throttled
+        response is returned at once when waiting for the retry would exceed
+        max_wait.
+
+        Args:
+            method (str): HTTP method, e.g. "GET" or "POST"
+            url (str): Request URL
+            priority (str, optional): INTERACTIVE or BACKGROUND, defaults to
+                the priority of the current context
+            maxlag (int, optional): maxlag parameter for MediaWiki API
+                requests. Background requests to api.php default to
+                DEFAULT_MAXLAG.
+            max_wait (float, optional): Longest total wait in seconds.
+                Defaults to INTERACTIVE_MAX_WAIT for interactive requests;
+                background requests wait as long as the upstream asks.
+            **kwargs: Passed on to requests
+
+        Returns:
+            requests.Response: The upstream response
+
+        Raises:
+            UpstreamThrottledError: If the host is paused beyond max_wait
+                before the request could be sent
+        """
+        priority = priority or current_priority()
+        host = urlparse(url).netloc
+
+        if max_wait is None and priority == INTERACTIVE:
+            max_wait = INTERACTIVE_MAX_WAIT
+        deadline = time.monotonic() + max_wait if max_wait is not None else None
+
+        if maxlag is None and priority == BACKGROUND and url.endswith('api.php'):
+            maxlag = DEFAULT_MAXLAG
+        if maxlag is not None:
+            kwargs['params'] = {**(kwargs.get('params') or {}), 'maxlag': maxlag}
+
+        send = getattr(requests, method.lower())
+        for attempt in range(self.max_retries + 1):
+            self.acquire(host, priority, deadline)
+            response = send(url, **kwargs)
+            retry_after = self._retry_after(response, attempt)
+            if retry_after is None:
+                self._recover(host)
+                return response
+            self._throttle(host, retry_after)
+
+            is_maxlag = 'X-Database-Lag' in response.headers
+            if method.upper() not in IDEMPOTENT_METHODS and not is_maxlag:
+                return response
+            if deadline is not None and time.monotonic() + retry_after > deadline:
+                return response
+        return response
+
+    def get(self, url: str, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def metrics(self) -> Dict[str, Dict]:
+        """
+        Return queue depth, throttling and wait-time metrics per upstream host.
+
+        "throttled" counts throttled upstream responses, "rejected" counts
+        requests given up because the host was paused beyond their deadline.
+        """
+        with self._lock:
+            upstreams = dict(self._upstreams)
+
+        now = time.monotonic()
+        result = {}
+        for host, upstream in upstreams.items():
+            with upstream.condition:
+                result[host] = {
+                    "queue_depth": dict(upstream.waiting),
+                    "requests": upstream.requests,
+                    "throttled": upstream.throttled,
+                    "rejected": upstream.rejected,
+                    "average_wait": upstream.total_wait / upstream.requests if upstream.requests else 0.0,
+                    "max_wait": upstream.max_wait,
+                    "rate": upstream.bucket.rate,
+                    "paused_for": max(0.0, upstream.paused_until - now),
+                }
+        return result
+
+
+# Shared scheduler used for all outbound requests of the application
+scheduler = OutboundScheduler()
@@ -0,0 +1,398 @@
+"""
+Job Utilities Module
+
+This module provides a lightweight in-process background job runner.
+Long operations (category scans, coverage reports, bulk imports) are submitted
+as jobs, executed on a bounded thread pool and tracked in the database so that
+clients can poll their progress through the /api/jobs endpoints.
+"""
+
+import inspect
+import json
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+
+from app.errors.custom_errors import (
+    InvalidJobParamsError,
+    JobCancelledError,
+    JobQueueFullError,
+    NotFoundError,
+)
+from app.models import Job, db, utcnow
+from app.utils.audio_match_utils import build_audio_index, propose_pronunciation_links
+from app.utils.commons_utils import fetch_audio_files_from_category
+from app.utils.http_utils import BACKGROUND, request_priority
+from app.utils.lexeme_utils import fetch_lexemes
+
+# Registry of job types that can be submitted through the API
+JOB_TYPES: Dict[str, Callable] = {}
+
+# Parameter checks run when a job of the type is submitted
+JOB_VALIDATORS: Dict[str, Callable] = {}
+
+
+def register_job(job_type: str, validate: Optional[Callable] = None):
+    """
+    Register a function as a job type.
+
+    The decorated function is called as ``func(context, **params)`` where
+    ``context`` is a JobContext used to report progress and check for
+    cancellation. Its return value is stored as the job result.
+
+    Args:
+        job_type (str): The name clients use to submit the job
+        validate (callable, optional): Called with the job params on
+            submission; raises InvalidJobParamsError if they are invalid
+    """
+    def decorator(func):
+        JOB_TYPES[job_type] = func
+        if validate is not None:
+            JOB_VALIDATORS[job_type] = validate
+        return func
+    return decorator
+
+
+def validate_job_params(job_type: str, params: Dict):
+    """
+    Check that the params can be passed to the job function of the type.
+
+    Raises:
+        InvalidJobParamsError: If arguments are missing or unexpected, or
+            the job type's validator rejects them
+    """
+    try:
+        inspect.signature(JOB_TYPES[job_type]).bind(None, **params)
+    except TypeError as e:
+        raise InvalidJobParamsError(f"Invalid params for {job_type}: {e}")
+    if job_type in JOB_VALIDATORS:
+        JOB_VALIDATORS[job_type](**params)
+
+
+class JobContext:
+    """
+    Handle passed to a running job for reporting progress.
+
+    Jobs should call ``update`` regularly; it persists progress and partial
+    results and raises JobCancelledError once cancellation was requested.
+    """
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+
+    def _load(self) -> Job:
+        # Drop cached state so that a cancellation committed by another
+        # request is seen
+        db.session.expire_all()
+        return db.session.get(Job, self.job_id)
+
+    def is_cancelled(self) -> bool:
+        job = self._load()
+        return job is None or job.cancel_requested
+
+    def update(self, progress: Optional[float] = None, partial_result=None):
+        """
+        Persist progress and an optional partial result.
+
+        Args:
+            progress (float, optional): Completion ratio between 0.0 and 1.0
+            partial_result (optional): JSON-serializable result so far
+
+        Raises:
+            JobCancelledError: If cancellation of the job was requested
+        """
+        job = self._load()
+        if job is None or job.cancel_requested:
+            raise JobCancelledError(f"Job {self.job_id} was cancelled")
+
+        if progress is not None:
+            job.progress = max(0.0, min(1.0, float(progress)))
+        if partial_result is not None:
+            job.result = json.dumps(partial_result)
+        db.session.commit()
+
+
+class JobRunner:
+    """
+    Bounded in-process job runner backed by the configured database.
+
+    Configuration keys read from the Flask app:
+        - JOB_MAX_WORKERS: Number of worker threads (default 4)
+        - JOB_MAX_PENDING: Maximum queued plus running jobs (default 100)
+        - JOB_HEARTBEAT_SECONDS: Interval at which the runner marks its jobs
+          as alive and sweeps for orphaned jobs (default 30)
+        - JOB_STALE_SECONDS: Jobs of other workers without a heartbeat for
+          this long are marked as interrupted (default 120)
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.executor = None
+        self.futures = {}
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._heartbeat = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('JOB_MAX_WORKERS', 4)
+        app.config.setdefault('JOB_MAX_PENDING', 100)
+        app.config.setdefault('JOB_HEARTBEAT_SECONDS', 30)
+        app.config.setdefault('JOB_STALE_SECONDS', 120)
+
+        self.app = app
+        self.started_at = utcnow()
+        self.executor = ThreadPoolExecutor(
+            max_workers=app.config['JOB_MAX_WORKERS'],
+            thread_name_prefix='job-runner'
+        )
+        app.extensions['job_runner'] = self
+
+        with app.app_context():
+            db.create_all()
+            self.recover_stale_jobs()
+
+        self._heartbeat = threading.Thread(
+            target=self._heartbeat_loop, name='job-runner-heartbeat', daemon=True
+        )
+        self._heartbeat.start()
+
+    def _is_orphaned(self, job: Job, cutoff) -> bool:
+        host, _, pid = (job.owner or '').rpartition(':')
+        if host == socket.gethostname() and pid.isdigit():
+            # Jobs of this host are orphaned as soon as their process is gone
+            if int(pid) == os.getpid():
+                # Only a previous process that had the same pid can have left these
+                return job.created_at < self.started_at
+            try:
+                os.kill(int(pid), 0)
+            except ProcessLookupError:
+                return True
+            except PermissionError:
+                pass
+        return job.heartbeat_at < cutoff
+
+    def recover_stale_jobs(self) -> int:
+        """
+        Mark jobs orphaned by a crashed or restarted worker as interrupted.
+
+        Jobs owned by a process on this host are recovered as soon as the
+        process no longer exists; jobs of other hosts once their heartbeat is
+        older than JOB_STALE_SECONDS.
+
+        Returns:
+            int: Number of jobs that were marked as interrupted
+        """
+        cutoff = utcnow() - timedelta(seconds=self.app.config['JOB_STALE_SECONDS'])
+        pending = Job.query.filter(Job.status.in_((Job.QUEUED, Job.RUNNING))).all()
+        stale = [job for job in pending if self._is_orphaned(job, cutoff)]
+        for job in stale:
+            job.status = Job.INTERRUPTED
+            job.error = "Job was interrupted by a worker restart"
+        db.session.commit()
+        return len(stale)
+
+    def beat(self):
+        """Refresh the heartbeat of this runner's pending jobs."""
+        Job.query.filter(
+            Job.owner == self.owner,
+            Job.status.in_((Job.QUEUED, Job.RUNNING))
+        ).update({Job.heartbeat_at: utcnow()}, synchronize_session=False)
+        db.session.commit()
+
+    def _heartbeat_loop(self):
+        while not self._stop.wait(self.app.config['JOB_HEARTBEAT_SECONDS']):
+            with self.app.app_context():
+                try:
+                    self.beat()
+                    self.recover_stale_jobs()
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception("Job heartbeat failed")
+
+    def submit(self, job_type: str, params: Optional[Dict] = None) -> Job:
+        """
+        Queue a registered job for background execution.
+
+        Args:
+            job_type (str): Name of a job registered with register_job
+            params (dict, optional): Keyword arguments for the job function
+
+        Returns:
+            Job: The newly created job
+
+        Raises:
+            NotFoundError: If the job type is not registered
+            InvalidJobParamsError: If the params do not fit the job type
+            JobQueueFullError: If JOB_MAX_PENDING jobs are already pending
+        """
+        func = JOB_TYPES.get(job_type)
+        if func is None:
+            raise NotFoundError(f"Unknown job type: {job_type}")
+
+        params = params or {}
+        validate_job_params(job_type, params)
+        pending = Job.query.filter(Job.status.in_((Job.QUEUED, Job.RUNNING))).count()
+        if pending >= self.app.config['JOB_MAX_PENDING']:
+            raise JobQueueFullError("Too many pending jobs, try again later")
+
+        job = Job(id=str(uuid.uuid4()), job_type=job_type, params=json.dumps(params),
+                  owner=self.owner)
+        db.session.add(job)
+        db.session.commit()
+
+        self.futures[job.id] = self.executor.submit(self._run, job.id, func, params)
+        return job
+
+    def get(self, job_id: str) -> Job:
+        """
+        Fetch a job by its ID.
+
+        Raises:
+            NotFoundError: If no job with this ID exists
+        """
+        job = db.session.get(Job, job_id)
+        if job is None:
+            raise NotFoundError(f"Job not found: {job_id}")
+        return job
+
+    def cancel(self, job_id: str) -> Job:
+        """
+        Request cancellation of a job.
+
+        Queued jobs are cancelled immediately; running jobs stop at their
+        next progress update. Finished jobs are returned unchanged.
+
+        Raises:
+            NotFoundError: If no job with this ID exists
+        """
+        job = self.get(job_id)
+        if job.is_finished:
+            return job
+
+        job.cancel_requested = True
+        future = self.futures.get(job_id)
+        if job.status == Job.QUEUED and (future is None or future.cancel()):
+            job.status = Job.CANCELLED
+        db.session.commit()
+        return job
+
+    def list_jobs(self, limit: int = 50) -> List[Job]:
+        """Return the most recently created jobs."""
+        return Job.query.order_by(Job.created_at.desc()).limit(limit).all()
+
+    def shutdown(self, wait: bool = True):
+        self._stop.set()
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, job_id: str, func: Callable, params: Dict):
+        # Outbound requests made by jobs yield to interactive requests
+        with self.app.app_context(), request_priority(BACKGROUND):
+            try:
+                job = db.session.get(Job, job_id)
+                if job is None:
+                    return
+                if job.cancel_requested:
+                    # Cancelled after the executor had already picked the job up
+                    self._finish(job_id, Job.CANCELLED)
+                    return
+                job.status = Job.RUNNING
+                db.session.commit()
+
+                result = func(JobContext(job_id), **params)
+
+                job = db.session.get(Job, job_id)
+                job.status = Job.COMPLETED
+                job.progress = 1.0
+                job.result = json.dumps(result)
+                db.session.commit()
+            except JobCancelledError:
+                db.session.rollback()
+                self._finish(job_id, Job.CANCELLED)
+            except Exception as e:
+                db.session.rollback()
+                self.app.logger.exception("Job %s failed", job_id)
+                self._finish(job_id, Job.FAILED, str(e))
+            finally:
+                self.futures.pop(job_id, None)
+
+    def _finish(self, job_id: str, status: str, error: Optional[str] = None):
+        job = db.session.get(Job, job_id)
+        if job is not None:
+            job.status = status
+            job.error = error
+            db.session.commit()
+
+
+def get_job_runner(app) -> Optional[JobRunner]:
+    """Return the JobRunner registered on the given app, or None if jobs are disabled."""
+    return app.extensions.get('job_runner')
+
+
+def _require_name_list(name: str, values):
+    # A single string would otherwise be processed one character at a time
+    if (not isinstance(values, list) or not values
+            or not all(isinstance(value, str) and value for value in values)):
+        raise InvalidJobParamsError(f"{name} must be a non-empty list of names")
+
+
+def _validate_category_list(categories):
+    _require_name_list("categories", categories)
+
+
+def _validate_audio_link_params(categories, lexeme_ids):
+    _require_name_list("categories", categories)
+    _require_name_list("lexeme_ids", lexeme_ids)
+
+
+@register_job('category-scan', validate=_validate_category_list)
+def scan_categories(context: JobContext, categories: List[str]) -> Dict[str, List]:
+    """
+    Fetch the audio files of several Commons categories.
+
+    Args:
+        context (JobContext): Progress reporting handle
+        categories (List[str]): Commons category names to scan
+
+    Returns:
+        Dict[str, List]: Audio files per category
+    """
+    results = {}
+    for index, category in enumerate(categories):
+        results[category] = fetch_audio_files_from_category(category)
+        context.update(progress=(index + 1) / len(categories), partial_result=results)
+    return results
+
+
+@register_job('propose-audio-links', validate=_validate_audio_link_params)
+def propose_audio_links(context: JobContext, categories: List[str],
+                        lexeme_ids: List[str]) -> List[Dict]:
+    """
+    Propose Lingua Libre recordings from Commons categories for lexeme forms.
+
+    Scans the categories, indexes the recordings with build_audio_index and
+    matches the forms of the lexemes against it.
+
+    Args:
+        context (JobContext): Progress reporting handle
+        categories (List[str]): Commons category names to scan
+        lexeme_ids (List[str]): Lexemes whose forms should get audio
+
+    Returns:
+        List[Dict]: Proposals as returned by propose_pronunciation_links
+    """
+    steps = len(categories) + 1
+    files = []
+    for index, category in enumerate(categories):
+        files.extend(fetch_audio_files_from_category(category))
+        context.update(progress=(index + 1) / steps)
+
+    audio_index = build_audio_index(files)
+    lexeme_forms, lexeme_languages = fetch_lexemes(lexeme_ids)
+    return propose_pronunciation_links(lexeme_forms, audio_index, lexeme_languages)
@@ -1,5 +1,6 @@
 import requests
 from typing import Dict, List
+from app.utils.http_utils import scheduler
 
 
 """
@@ -26,7 +27,7 @@ def get_supported_languages() -> Dict[str, str]:
     }
     
     try:
-        response = requests.get(url, params=params)
+        response = scheduler.get(url, params=params)
         response.raise_for_status()
         data = response.json()
         
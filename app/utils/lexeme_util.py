@@ -21,29 +21,57 @@ def get_lexeme_forms(json_string):
         if not isinstance(lexeme_data, dict):
             raise ValueError("Invalid JSON format. Expected a dictionary.")
         
-        lexeme_forms = {}
-        
-        for lex_id, lex_info in lexeme_data.items():
-            forms = lex_info.get("forms", [])
-            form_details = []
-            
-            for form in forms:
-                form_id = form.get("id")  # LID-F# format
-                representations = form.get("representations", {})  # Dictionary of {lang_code: text}
-                grammatical_features = form.get("grammaticalFeatures", [])  # List of Wikidata item references
-                statements = form.get("statements", {})  # Additional metadata
-                
-                form_details.append({
-                    "form_id": form_id,
-                    "representations": representations,
-                    "grammatical_features": grammatical_features,
-                    "statements": statements
-                })
-            
-            lexeme_forms[lex_id] = form_details
-        
-        return lexeme_forms
+        return extract_lexeme_forms(lexeme_data)
     
     except json.JSONDecodeError:
         print("Error: Invalid JSON string.")
         return None
+
+def extract_lexeme_forms(lexeme_data):
+    """
+    Extracts the forms of already decoded lexeme entities, e.g. the "entities" of a wbgetentities response.
+
+    Args:
+        lexeme_data (dict): Lexeme entities keyed by lexeme ID.
+
+    Returns:
+        dict: Form information per lexeme ID, in the same format as get_lexeme_forms.
+    """
+    lexeme_forms = {}
+    
+    for lex_id, lex_info in lexeme_data.items():
+        forms = lex_info.get("forms", [])
+        form_details = []
+        
+        for form in forms:
+            form_id = form.get("id")  # LID-F# format
+            representations = form.get("representations", {})  # Dictionary of {lang_code: text}
+            grammatical_features = form.get("grammaticalFeatures", [])  # List of Wikidata item references
+            statements = form.get("statements", {})  # Additional metadata
+            
+            form_details.append({
+                "form_id": form_id,
+                "representations": representations,
+                "grammatical_features": grammatical_features,
+                "statements": statements
+            })
+        
+        lexeme_forms[lex_id] = form_details
+    
+    return lexeme_forms
+
+def extract_lexeme_languages(lexeme_data):
+    """
+    Extracts the language item of already decoded lexeme entities.
+
+    Args:
+        lexeme_data (dict): Lexeme entities keyed by lexeme ID.
+
+    Returns:
+        dict: Language QID (e.g. "Q1860") per lexeme ID; lexemes without a language are left out.
+    """
+    return {
+        lex_id: lex_info["language"]
+        for lex_id, lex_info in lexeme_data.items()
+        if lex_info.get("language")
+    }
@@ -6,9 +6,20 @@ It includes functions for word sanitization and SPARQL-based lexeme search opera
 """
 
 import requests
-from typing import List, Dict
+from typing import Dict, Iterable, List, Optional, Tuple
 import re
 from urllib.parse import quote
+from app.utils.http_utils import scheduler
+from app.utils.lexeme_util import extract_lexeme_forms, extract_lexeme_languages
+
+# Wikidata property for pronunciation audio
+PRONUNCIATION_AUDIO_PROPERTY = "P443"
+
+# Extra data search_lexemes can return for each lexeme
+SEARCH_INCLUDES = ("forms", "audio")
+
+# Maximum number of IDs per wbgetentities request
+WBGETENTITIES_BATCH_SIZE = 50
 
 def sanitize_word(word: str) -> str:
     """
@@ -32,7 +43,71 @@ def sanitize_word(word: str) -> str:
     # Remove all non-word characters (except spaces) and convert to lowercase
     return re.sub(r'[^\w\s]', '', word).lower().strip()
 
-def search_lexemes(word: str) -> List[Dict]:
+def get_pronunciation_files(statements: Dict) -> List[str]:
+    """
+    Extract the pronunciation audio (P443) file names from form statements.
+
+    Args:
+        statements (Dict): Statements of a form, keyed by property ID
+
+    Returns:
+        List[str]: Commons file names, in statement order
+    """
+    files = []
+    for statement in statements.get(PRONUNCIATION_AUDIO_PROPERTY, []):
+        value = statement.get("mainsnak", {}).get("datavalue", {}).get("value")
+        if value:
+            files.append(value)
+    return files
+
+
+def fetch_lexemes(lexeme_ids: List[str]) -> Tuple[Dict[str, List[Dict]], Dict[str, str]]:
+    """
+    Fetch the forms and languages of several lexemes with batched wbgetentities requests.
+
+    Args:
+        lexeme_ids (List[str]): Lexeme IDs (e.g., ["L123", "L456"])
+
+    Returns:
+        Tuple[Dict[str, List[Dict]], Dict[str, str]]: Forms per lexeme ID, in
+        the get_lexeme_forms format, and the language item ID per lexeme ID
+
+    Raises:
+        requests.RequestException: If a request fails
+    """
+    url = "https://www.wikidata.org/w/api.php"
+    entities = {}
+
+    for start in range(0, len(lexeme_ids), WBGETENTITIES_BATCH_SIZE):
+        params = {
+            "action": "wbgetentities",
+            "ids": "|".join(lexeme_ids[start:start + WBGETENTITIES_BATCH_SIZE]),
+            "format": "json"
+        }
+        response = scheduler.get(url, params=params)
+        response.raise_for_status()
+        entities.update(response.json().get("entities", {}))
+
+    return extract_lexeme_forms(entities), extract_lexeme_languages(entities)
+
+
+def fetch_lexeme_forms(lexeme_ids: List[str]) -> Dict[str, List[Dict]]:
+    """
+    Fetch the forms of several lexemes with batched wbgetentities requests.
+
+    Args:
+        lexeme_ids (List[str]): Lexeme IDs (e.g., ["L123", "L456"])
+
+    Returns:
+        Dict[str, List[Dict]]: Forms per lexeme ID, in the get_lexeme_forms format
+
+    Raises:
+        requests.RequestException: If a request fails
+    """
+    return fetch_lexemes(lexeme_ids)[0]
+
+
+def search_lexemes(word: str, include: Optional[Iterable[str]] = None) -> List[Dict]:
     """
     Search for lexemes in Wikidata matching the given word.
     
@@ -45,14 +120,24 @@ def search_lexemes(word: str) -> List[Dict]:
     3. Retrieves language information
     4. Returns lexeme ID, lemma, and language label
     
+    When forms or audio are included, the forms of all matching lexemes are
+    fetched with one batched wbgetentities request, so that clients do not
+    have to request every lexeme separately.
+    
     Args:
         word (str): The word to search for in Wikidata
+        include (Iterable[str], optional): Extra data to return, any of
+            "forms" and "audio"
         
     Returns:
         List[Dict]: List of dictionaries containing matching lexemes with properties:
             - id: The Wikidata lexeme ID (e.g., "L123")
             - lemma: The word form of the lexeme
             - language: The language name in English
+            - forms: With "forms" included, the forms of the lexeme in the
+              get_lexeme_forms format, or None if they could not be fetched
+            - audio: With "audio" included, the pronunciation files per form
+              ID, or None if they could not be fetched
             
     Example:
         >>> search_lexemes("hello")
@@ -96,7 +181,7 @@ def search_lexemes(word: str) -> List[Dict]:
     
     try:
         # Make the API request
-        response = requests.get(url, params=params)
+        response = scheduler.get(url, params=params)
         response.raise_for_status()
         data = response.json()
         
@@ -113,10 +198,39 @@ def search_lexemes(word: str) -> List[Dict]:
                 "language": item["languageLabel"]["value"]
             }
             results.append(lexeme)
-            
-        return results
+        
+        return _add_forms(results, set(include or ()))
         
     except requests.RequestException as e:
         # Log the error and return empty results
         print(f"Error searching lexemes: {str(e)}")
-        return [] 
\ No newline at end of file
+        return []
+
+
+def _add_forms(results: List[Dict], include: set) -> List[Dict]:
+    """
+    Add the requested forms and audio to lexeme search results.
+
+    If fetching the forms fails, the results are returned with "forms" and
+    "audio" set to None to mark them as unavailable.
+    """
+    if not results or not include & set(SEARCH_INCLUDES):
+        return results
+
+    try:
+        lexeme_forms = fetch_lexeme_forms(list(dict.fromkeys(r["id"] for r in results)))
+    except requests.RequestException as e:
+        # Keep the search results, only the extra data is unavailable
+        print(f"Error fetching lexeme forms: {str(e)}")
+        lexeme_forms = None
+
+    for lexeme in results:
+        forms = lexeme_forms.get(lexeme["id"], []) if lexeme_forms is not None else None
+        if "forms" in include:
+            lexeme["forms"] = forms
+        if "audio" in include:
+            lexeme["audio"] = {
+                form["form_id"]: get_pronunciation_files(form["statements"])
+                for form in forms
+            } if forms is not None else None
+    return results
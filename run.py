@@ -4,8 +4,8 @@ from app import create_app
 # Print the current working directory to confirm the app is running from the right place
 print(f"Current working directory: {os.getcwd()}")
 
-# Create the Flask app
-app = create_app()
+# Create the Flask app with the background job runner
+app = create_app({'JOB_RUNNER_ENABLED': True})
 
 # Run the app
 if __name__ == '__main__':
@@ -0,0 +1,164 @@
+"""
+Test Module for Audio Match Utilities
+
+This module contains unit tests for matching Lingua Libre files to lexeme forms.
+"""
+
+import unittest
+from app.utils.audio_match_utils import (
+    build_audio_index,
+    parse_lingua_libre_filename,
+    propose_pronunciation_links,
+)
+
+
+class TestAudioMatchUtils(unittest.TestCase):
+    def setUp(self):
+        self.files = [
+            {'file': 'LL-Q150 (fra)-Poslovitch-Bonjour.wav'},
+            {'file': 'File:LL-Q1860_(eng)-Jane-well-being.wav'},
+            {'file': 'audio_file_1.mp3'},
+        ]
+        self.lexeme_forms = {
+            "L1": [
+                {
+                    "form_id": "L1-F1",
+                    "representations": {"fr": {"language": "fr", "value": "bonjour"}},
+                    "grammatical_features": [],
+                    "statements": {}
+                }
+            ],
+            "L2": [
+                {
+                    "form_id": "L2-F1",
+                    "representations": {"en": "well-being"},
+                    "grammatical_features": [],
+                    "statements": {}
+                },
+                {
+                    "form_id": "L2-F2",
+                    "representations": {"en": "well-beings"},
+                    "grammatical_features": [],
+                    "statements": {}
+                }
+            ],
+            "L3": [
+                {
+                    "form_id": "L3-F1",
+                    "representations": {"fr": "bonjour"},
+                    "grammatical_features": [],
+                    "statements": {"P443": [{"mainsnak": {}}]}
+                }
+            ]
+        }
+
+    def test_parse_lingua_libre_filename(self):
+        parsed = parse_lingua_libre_filename('File:LL-Q1860_(eng)-Jane-well-being.wav')
+        self.assertEqual(parsed["qid"], "Q1860")
+        self.assertEqual(parsed["iso"], "eng")
+        self.assertEqual(parsed["user"], "Jane")
+        self.assertEqual(parsed["word"], "well-being")
+        self.assertEqual(parsed["file"], "LL-Q1860 (eng)-Jane-well-being.wav")
+
+        self.assertIsNone(parse_lingua_libre_filename('audio_file_1.mp3'))
+
+    def test_build_audio_index(self):
+        index = build_audio_index(self.files)
+        self.assertEqual(index[("Q150", "bonjour")], ["LL-Q150 (fra)-Poslovitch-Bonjour.wav"])
+        self.assertIn(("Q1860", "well-being"), index)
+        # "Jane-well" could also be the user name
+        self.assertIn(("Q1860", "being"), index)
+        self.assertEqual(len(index), 3)
+
+    def test_propose_pronunciation_links(self):
+        index = build_audio_index(self.files)
+        proposals = propose_pronunciation_links(
+            self.lexeme_forms, index, {"L1": "Q150", "L2": "Q1860", "L3": "Q150"}
+        )
+
+        # L2-F2 has no recording and L3-F1 already has audio
+        self.assertEqual([p["form_id"] for p in proposals], ["L1-F1", "L2-F1"])
+        self.assertEqual(proposals[0]["files"], ["LL-Q150 (fra)-Poslovitch-Bonjour.wav"])
+        self.assertEqual(proposals[1]["representation"], "well-being")
+
+    def test_combining_marks_are_kept(self):
+        index = build_audio_index(['LL-Q11059 (hin)-Jane-नमस्ते.wav'])
+        lexeme_forms = {
+            "L4": [
+                {
+                    "form_id": "L4-F1",
+                    "representations": {"hi": "नमस्त"},
+                    "grammatical_features": [],
+                    "statements": {}
+                },
+                {
+                    "form_id": "L4-F2",
+                    "representations": {"hi": "नमस्ते"},
+                    "grammatical_features": [],
+                    "statements": {}
+                }
+            ]
+        }
+        proposals = propose_pronunciation_links(lexeme_forms, index, {"L4": "Q11059"})
+        self.assertEqual([p["form_id"] for p in proposals], ["L4-F2"])
+
+        # "ß" is not folded to "ss"
+        index = build_audio_index(['LL-Q188 (deu)-Jane-Masse.wav'])
+        lexeme_forms = {
+            "L5": [
+                {
+                    "form_id": "L5-F1",
+                    "representations": {"de": "Maße"},
+                    "grammatical_features": [],
+                    "statements": {}
+                },
+                {
+                    "form_id": "L5-F2",
+                    "representations": {"de": "Masse"},
+                    "grammatical_features": [],
+                    "statements": {}
+                }
+            ]
+        }
+        proposals = propose_pronunciation_links(lexeme_forms, index, {"L5": "Q188"})
+        self.assertEqual([p["form_id"] for p in proposals], ["L5-F2"])
+
+    def test_hyphenated_user_names(self):
+        parsed = parse_lingua_libre_filename('LL-Q188 (deu)-Jan-Luc-Weg.wav')
+        self.assertEqual((parsed["user"], parsed["word"]), ("Jan", "Luc-Weg"))
+
+        index = build_audio_index(['LL-Q188 (deu)-Jan-Luc-Weg.wav'])
+        lexeme_forms = {
+            "L6": [
+                {
+                    "form_id": "L6-F1",
+                    "representations": {"de": "Weg"},
+                    "grammatical_features": [],
+                    "statements": {}
+                }
+            ]
+        }
+        proposals = propose_pronunciation_links(lexeme_forms, index, {"L6": "Q188"})
+        self.assertEqual([p["form_id"] for p in proposals], ["L6-F1"])
+
+        # The hyphenated word is preferred if a form has it
+        lexeme_forms["L7"] = [
+            {
+                "form_id": "L7-F1",
+                "representations": {"de": "Luc-Weg"},
+                "grammatical_features": [],
+                "statements": {}
+            }
+        ]
+        proposals = propose_pronunciation_links(lexeme_forms, index, {"L6": "Q188", "L7": "Q188"})
+        self.assertEqual([p["form_id"] for p in proposals], ["L7-F1"])
+
+    def test_propose_requires_lexeme_language(self):
+        index = build_audio_index(['LL-Q150 (fra)-Poslovitch-bonjour.wav'])
+        # ISO 639-3 codes in file names do not match representation codes
+        self.assertEqual(propose_pronunciation_links(self.lexeme_forms, index, {}), [])
+        proposals = propose_pronunciation_links(self.lexeme_forms, index, {"L1": "Q150"})
+        self.assertEqual([p["form_id"] for p in proposals], ["L1-F1"])
+
+if __name__ == '__main__':
+    unittest.main()
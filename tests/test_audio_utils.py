@@ -0,0 +1,188 @@
+"""
+Test Module for Audio Utilities
+
+This module contains unit tests for the WAV preprocessing stage.
+"""
+
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+import wave
+
+import numpy as np
+
+from app.utils import audio_utils
+from app.utils.audio_utils import analyze, preprocess_batch, preprocess_wav
+
+
+def write_wav(path, samples, rate, sample_width=2):
+    """Write float samples of shape (frames, channels) as PCM WAV."""
+    scale = 2 ** (8 * sample_width - 1)
+    ints = np.clip(samples * scale, -scale, scale - 1).astype('<i4')
+    if sample_width == 2:
+        raw = ints.astype('<i2').tobytes()
+    else:
+        raw = ints.view(np.uint8).reshape(-1, 4)[:, :sample_width].tobytes()
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(samples.shape[1])
+        wav.setsampwidth(sample_width)
+        wav.setframerate(rate)
+        wav.writeframes(raw)
+
+
+def read_wav(path):
+    with wave.open(path, 'rb') as wav:
+        data = np.frombuffer(wav.readframes(wav.getnframes()), dtype='<i2')
+        return wav.getframerate(), wav.getnchannels(), data / 32768.0
+
+
+class TestAudioUtils(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.rate = 16000
+        # 0.5 s silence, 1 s stereo tone at half amplitude, 0.5 s silence
+        t = np.arange(self.rate) / self.rate
+        tone = 0.5 * np.sin(2 * np.pi * 440 * t)
+        silence = np.zeros(self.rate // 2)
+        mono = np.concatenate([silence, tone, silence])
+        self.samples = np.stack([mono, mono], axis=1)
+        self.input_path = os.path.join(self.directory, 'input.wav')
+        write_wav(self.input_path, self.samples, self.rate)
+
+        # Use small blocks so that the tests cover block boundaries
+        self.block_frames = audio_utils.BLOCK_FRAMES
+        audio_utils.BLOCK_FRAMES = 1000
+
+    def tearDown(self):
+        audio_utils.BLOCK_FRAMES = self.block_frames
+        shutil.rmtree(self.directory)
+
+    def test_analyze_finds_speech(self):
+        info = analyze(self.input_path)
+        padding = int(self.rate * audio_utils.PADDING_SECONDS)
+        self.assertEqual(info["start"], self.rate // 2 - padding)
+        self.assertEqual(info["stop"], self.rate // 2 + self.rate + padding)
+        self.assertAlmostEqual(info["peak"], 0.5, places=3)
+        self.assertAlmostEqual(info["rms"], 0.5 / np.sqrt(2), places=2)
+
+    def test_preprocess_trims_normalizes_and_resamples(self):
+        output_path = os.path.join(self.directory, 'output.wav')
+        summary = preprocess_wav(self.input_path, output_path, target_rate=8000)
+
+        rate, channels, data = read_wav(output_path)
+        self.assertEqual(rate, 8000)
+        self.assertEqual(channels, 1)
+        # 1 s of tone plus padding on both sides
+        expected = 8000 * (1 + 2 * audio_utils.PADDING_SECONDS)
+        self.assertAlmostEqual(len(data), expected, delta=2)
+        self.assertAlmostEqual(summary["output_seconds"], len(data) / 8000)
+        self.assertAlmostEqual(np.abs(data).max(), 10 ** (-1 / 20), places=2)
+        self.assertAlmostEqual(summary["gain_db"], -1 - 20 * np.log10(0.5), places=1)
+
+    def test_downsampling_filters_frequencies_above_nyquist(self):
+        input_path = os.path.join(self.directory, 'input48k.wav')
+        t = np.arange(48000) / 48000
+        tone = 0.5 * np.sin(2 * np.pi * 10000 * t)
+        write_wav(input_path, tone[:, np.newaxis], 48000)
+        output_path = os.path.join(self.directory, 'output.wav')
+
+        preprocess_wav(input_path, output_path, target_rate=16000, normalize=None)
+
+        # A 10 kHz tone cannot be represented at 16 kHz and must not alias
+        rate, _, data = read_wav(output_path)
+        self.assertEqual(rate, 16000)
+        self.assertAlmostEqual(len(data), 16000, delta=2)
+        self.assertLess(np.sqrt(np.mean(data ** 2)), 0.01)
+
+    def test_preprocess_never_upsamples(self):
+        output_path = os.path.join(self.directory, 'output.wav')
+        preprocess_wav(self.input_path, output_path)
+        self.assertEqual(read_wav(output_path)[0], self.rate)
+
+        preprocess_wav(self.input_path, output_path, target_rate=48000)
+        self.assertEqual(read_wav(output_path)[0], self.rate)
+
+    def test_preprocess_rms_keeps_rate_and_channels(self):
+        output_path = os.path.join(self.directory, 'output.wav')
+        preprocess_wav(self.input_path, output_path, target_rate=None,
+                       mono=False, normalize='rms', target_db=-12.0)
+
+        rate, channels, data = read_wav(output_path)
+        self.assertEqual(rate, self.rate)
+        self.assertEqual(channels, 2)
+        # The loudness is measured without the silence kept as padding
+        padding = int(self.rate * audio_utils.PADDING_SECONDS) * channels
+        tone = data[padding:-padding]
+        self.assertAlmostEqual(np.sqrt(np.mean(tone ** 2)), 10 ** (-12 / 20), places=2)
+
+    def test_preprocess_24_bit_input(self):
+        input_path = os.path.join(self.directory, 'input24.wav')
+        write_wav(input_path, self.samples, self.rate, sample_width=3)
+        output_path = os.path.join(self.directory, 'output.wav')
+        preprocess_wav(input_path, output_path, target_rate=None, normalize=None)
+
+        _, _, data = read_wav(output_path)
+        self.assertAlmostEqual(np.abs(data).max(), 0.5, places=3)
+
+    def test_unknown_normalization(self):
+        with self.assertRaises(ValueError):
+            preprocess_wav(self.input_path, os.path.join(self.directory, 'out.wav'),
+                           normalize='loud')
+        # The mode is checked before the file is read
+        with self.assertRaises(ValueError):
+            preprocess_wav(os.path.join(self.directory, 'missing.wav'),
+                           os.path.join(self.directory, 'out.wav'), normalize='loud')
+
+    def test_silent_input(self):
+        output_path = os.path.join(self.directory, 'out.wav')
+        for name, frames in (('silent.wav', 16000), ('empty.wav', 0)):
+            input_path = os.path.join(self.directory, name)
+            write_wav(input_path, np.zeros((frames, 1)), self.rate)
+            with self.assertRaises(ValueError):
+                preprocess_wav(input_path, output_path)
+        self.assertFalse(os.path.exists(output_path))
+
+    def test_unsupported_wav_format(self):
+        # 32-bit IEEE float WAV (format tag 3), which the wave module rejects
+        input_path = os.path.join(self.directory, 'float.wav')
+        data = np.zeros(100, dtype='<f4').tobytes()
+        fmt = struct.pack('<HHIIHH', 3, 1, 16000, 64000, 4, 32)
+        with open(input_path, 'wb') as f:
+            f.write(b'RIFF' + struct.pack('<I', 4 + 8 + len(fmt) + 8 + len(data)) + b'WAVE')
+            f.write(b'fmt ' + struct.pack('<I', len(fmt)) + fmt)
+            f.write(b'data' + struct.pack('<I', len(data)) + data)
+
+        with self.assertRaises(ValueError):
+            preprocess_wav(input_path, os.path.join(self.directory, 'out.wav'))
+
+    def test_preprocess_batch(self):
+        files = [(self.input_path, os.path.join(self.directory, f'out{i}.wav')) for i in range(2)]
+        report = preprocess_batch(files, workers=2, target_rate=8000)
+
+        self.assertEqual(len(report["results"]), 2)
+        self.assertEqual(report["workers"], 2)
+        self.assertAlmostEqual(report["audio_seconds"], 4.0)
+        self.assertGreater(report["audio_seconds_per_core"], 0)
+        for _, output_path in files:
+            self.assertTrue(os.path.exists(output_path))
+
+    def test_preprocess_batch_reports_failed_files(self):
+        missing_path = os.path.join(self.directory, 'missing.wav')
+        files = [
+            (self.input_path, os.path.join(self.directory, 'out0.wav')),
+            (missing_path, os.path.join(self.directory, 'out1.wav')),
+        ]
+        report = preprocess_batch(files, workers=2, target_rate=8000)
+
+        self.assertEqual(report["failed"], 1)
+        self.assertNotIn("error", report["results"][0])
+        self.assertEqual(report["results"][1]["input"], missing_path)
+        self.assertIn("error", report["results"][1])
+        # Only the processed file counts towards the throughput
+        self.assertAlmostEqual(report["audio_seconds"], 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
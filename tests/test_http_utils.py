@@ -0,0 +1,191 @@
+"""
+Test Module for HTTP Utilities
+
+This module contains unit tests for the outbound request scheduler.
+"""
+
+import threading
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+from flask import Flask
+from app.errors.custom_errors import UpstreamThrottledError
+from app.routes import main_bp
+from app.utils.http_utils import (
+    BACKGROUND,
+    DEFAULT_MAXLAG,
+    INTERACTIVE,
+    OutboundScheduler,
+    TokenBucket,
+    current_priority,
+    request_priority,
+)
+
+API_URL = "https://www.wikidata.org/w/api.php"
+
+
+def make_response(status_code=200, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+
+class TestOutboundScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = OutboundScheduler({"www.wikidata.org": (1000.0, 1)})
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(rate=2.0, capacity=1)
+        now = bucket.updated
+        self.assertEqual(bucket.time_until_token(now), 0.0)
+        bucket.consume(now)
+        self.assertAlmostEqual(bucket.time_until_token(now), 0.5)
+        self.assertEqual(bucket.time_until_token(now + 0.5), 0.0)
+
+    def test_request_priority_context(self):
+        self.assertEqual(current_priority(), INTERACTIVE)
+        with request_priority(BACKGROUND):
+            self.assertEqual(current_priority(), BACKGROUND)
+        self.assertEqual(current_priority(), INTERACTIVE)
+
+    @patch('requests.get')
+    def test_retries_after_429(self, mock_get):
+        mock_get.side_effect = [
+            make_response(429, {"Retry-After": "0"}),
+            make_response(200),
+        ]
+
+        response = self.scheduler.get(API_URL, params={"action": "query"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_get.call_count, 2)
+        metrics = self.scheduler.metrics()["www.wikidata.org"]
+        self.assertEqual(metrics["throttled"], 1)
+        self.assertEqual(metrics["requests"], 2)
+
+    @patch('requests.get')
+    def test_maxlag_backs_off_and_lowers_rate(self, mock_get):
+        mock_get.side_effect = [
+            make_response(200, {"Retry-After": "0", "X-Database-Lag": "7"}),
+            make_response(200),
+        ]
+
+        self.scheduler.get(API_URL, priority=BACKGROUND, params={"action": "query"})
+
+        # Background requests to the MediaWiki API send maxlag
+        params = mock_get.call_args.kwargs["params"]
+        self.assertEqual(params, {"action": "query", "maxlag": DEFAULT_MAXLAG})
+        # The rate was halved and then partially restored
+        self.assertEqual(self.scheduler.metrics()["www.wikidata.org"]["rate"], 600.0)
+
+    @patch('requests.get')
+    def test_gives_up_after_max_retries(self, mock_get):
+        mock_get.return_value = make_response(503, {"Retry-After": "0"})
+        self.scheduler.max_retries = 1
+
+        response = self.scheduler.get(API_URL)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('requests.get')
+    def test_interactive_request_does_not_wait_for_long_pause(self, mock_get):
+        mock_get.return_value = make_response(429, {"Retry-After": "120"})
+
+        start = time.monotonic()
+        response = self.scheduler.get(API_URL)
+
+        # The throttled response is returned instead of sleeping for 120 s
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertLess(time.monotonic() - start, 1)
+
+        # Further interactive requests fail fast while the host is paused
+        with self.assertRaises(UpstreamThrottledError):
+            self.scheduler.get(API_URL)
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(self.scheduler.metrics()["www.wikidata.org"]["rejected"], 1)
+
+    @patch('requests.post')
+    def test_post_is_not_retried_on_plain_503(self, mock_post):
+        mock_post.return_value = make_response(503, {"Retry-After": "0"})
+
+        response = self.scheduler.post(API_URL, data={"action": "edit"})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(mock_post.call_count, 1)
+
+    @patch('requests.post')
+    def test_post_is_retried_on_maxlag(self, mock_post):
+        mock_post.side_effect = [
+            make_response(200, {"Retry-After": "0", "X-Database-Lag": "7"}),
+            make_response(200),
+        ]
+
+        self.scheduler.post(API_URL, data={"action": "edit"})
+
+        self.assertEqual(mock_post.call_count, 2)
+
+    def test_interactive_requests_go_first(self):
+        # After the pause the second request waits 0.1 s for a token
+        scheduler = OutboundScheduler({"example.org": (10.0, 1)})
+        upstream = scheduler._upstream("example.org")
+        upstream.paused_until = time.monotonic() + 60
+        order = []
+
+        def acquire(priority):
+            scheduler.acquire("example.org", priority)
+            order.append(priority)
+
+        def wait_until_queued(priority):
+            while not scheduler.metrics()["example.org"]["queue_depth"][priority]:
+                time.sleep(0.001)
+
+        background = threading.Thread(target=acquire, args=(BACKGROUND,))
+        background.start()
+        wait_until_queued(BACKGROUND)
+        interactive = threading.Thread(target=acquire, args=(INTERACTIVE,))
+        interactive.start()
+        wait_until_queued(INTERACTIVE)
+        self.assertEqual(scheduler.metrics()["example.org"]["queue_depth"],
+                         {INTERACTIVE: 1, BACKGROUND: 1})
+
+        with upstream.condition:
+            upstream.paused_until = 0.0
+            upstream.condition.notify_all()
+        background.join()
+        interactive.join()
+
+        self.assertEqual(order, [INTERACTIVE, BACKGROUND])
+
+    def test_background_request_behind_interactive_respects_deadline(self):
+        scheduler = OutboundScheduler({"example.org": (1000.0, 1)})
+        upstream = scheduler._upstream("example.org")
+        upstream.paused_until = time.monotonic() + 60
+        interactive = threading.Thread(target=scheduler.acquire, args=("example.org", INTERACTIVE))
+        interactive.start()
+        while not scheduler.metrics()["example.org"]["queue_depth"][INTERACTIVE]:
+            time.sleep(0.001)
+
+        start = time.monotonic()
+        with self.assertRaises(UpstreamThrottledError):
+            scheduler.acquire("example.org", BACKGROUND, deadline=start + 0.05)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(scheduler.metrics()["example.org"]["rejected"], 1)
+
+        with upstream.condition:
+            upstream.paused_until = 0.0
+            upstream.condition.notify_all()
+        interactive.join()
+
+    def test_metrics_endpoint(self):
+        app = Flask(__name__)
+        app.register_blueprint(main_bp)
+        response = app.test_client().get('/api/metrics/outbound')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.get_json(), dict)
+
+
+if __name__ == '__main__':
+    unittest.main()
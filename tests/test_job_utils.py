@@ -0,0 +1,237 @@
+"""
+Test Module for Job Utilities
+
+This module contains unit tests for the background job runner and the
+job polling API endpoints.
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from app import create_app
+from app.models import Job, db, utcnow
+from app.utils.job_utils import JOB_TYPES, get_job_runner, register_job
+
+# Released by tests to let the blocking job finish
+release_event = threading.Event()
+
+
+@register_job('test-echo')
+def echo_job(context, value):
+    context.update(progress=0.5, partial_result={"partial": value})
+    return {"value": value}
+
+
+@register_job('test-blocking')
+def blocking_job(context):
+    while not release_event.wait(0.01):
+        context.update()
+    return "done"
+
+
+@register_job('test-failing')
+def failing_job(context):
+    raise ValueError("boom")
+
+
+class TestJobRunner(unittest.TestCase):
+    """
+    Test cases for the job runner and the /api/jobs endpoints.
+    """
+
+    def setUp(self):
+        release_event.clear()
+        # A file database, since an in-memory one shares a single
+        # connection between the request and worker threads
+        self.db_fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        self.app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{self.db_path}',
+            'JOB_RUNNER_ENABLED': True,
+            'JOB_MAX_WORKERS': 1,
+            'JOB_MAX_PENDING': 3,
+        })
+        self.runner = get_job_runner(self.app)
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        release_event.set()
+        self.runner.shutdown()
+        os.close(self.db_fd)
+        os.unlink(self.db_path)
+
+    def wait_for(self, job_id, statuses=Job.FINISHED_STATES, timeout=5):
+        """Poll the API until the job reaches one of the given statuses."""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            data = self.client.get(f'/api/jobs/{job_id}').get_json()
+            if data["status"] in statuses:
+                return data
+            time.sleep(0.01)
+        self.fail(f"Job {job_id} did not reach {statuses}")
+
+    def submit(self, job_type, params=None):
+        return self.client.post('/api/jobs', json={"type": job_type, "params": params or {}})
+
+    def test_job_completes_with_result(self):
+        response = self.submit('test-echo', {"value": 42})
+        self.assertEqual(response.status_code, 202)
+        job_id = response.get_json()["id"]
+        self.assertEqual(response.headers["Location"], f"/api/jobs/{job_id}")
+
+        data = self.wait_for(job_id)
+        self.assertEqual(data["status"], Job.COMPLETED)
+        self.assertEqual(data["progress"], 1.0)
+        self.assertEqual(data["result"], {"value": 42})
+
+    def test_failing_job_records_error(self):
+        job_id = self.submit('test-failing').get_json()["id"]
+        data = self.wait_for(job_id)
+        self.assertEqual(data["status"], Job.FAILED)
+        self.assertEqual(data["error"], "boom")
+
+    def test_cancel_running_and_queued_jobs(self):
+        running_id = self.submit('test-blocking').get_json()["id"]
+        self.wait_for(running_id, (Job.RUNNING,))
+
+        # The single worker is busy, so this job stays queued
+        queued_id = self.submit('test-echo', {"value": 1}).get_json()["id"]
+        response = self.client.delete(f'/api/jobs/{queued_id}')
+        self.assertEqual(response.get_json()["status"], Job.CANCELLED)
+
+        self.client.delete(f'/api/jobs/{running_id}')
+        data = self.wait_for(running_id)
+        self.assertEqual(data["status"], Job.CANCELLED)
+
+    def test_pending_limit(self):
+        for _ in range(3):
+            self.assertEqual(self.submit('test-blocking').status_code, 202)
+        response = self.submit('test-blocking')
+        self.assertEqual(response.status_code, 503)
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.client.post('/api/jobs', json={}).status_code, 400)
+        self.assertEqual(self.submit('no-such-job').status_code, 400)
+        self.assertEqual(self.client.get('/api/jobs/missing').status_code, 404)
+        self.assertEqual(self.client.delete('/api/jobs/missing').status_code, 404)
+
+    def test_invalid_params(self):
+        # Missing and unexpected arguments
+        self.assertEqual(self.submit('test-echo').status_code, 400)
+        self.assertEqual(self.submit('test-echo', {"value": 1, "other": 2}).status_code, 400)
+        # A single category name instead of a list
+        response = self.submit('category-scan', {"categories": "Foo"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("categories", response.get_json()["error"])
+        with self.app.app_context():
+            self.assertEqual(Job.query.count(), 0)
+
+    def test_recover_stale_jobs(self):
+        with self.app.app_context():
+            stale = Job(id='stale', job_type='test-echo', status=Job.RUNNING,
+                        owner='other-host:1', heartbeat_at=utcnow() - timedelta(hours=1))
+            fresh = Job(id='fresh', job_type='test-echo', status=Job.RUNNING,
+                        owner='other-host:1')
+            db.session.add_all([stale, fresh])
+            db.session.commit()
+
+            self.assertEqual(self.runner.recover_stale_jobs(), 1)
+            self.assertEqual(db.session.get(Job, 'stale').status, Job.INTERRUPTED)
+            self.assertEqual(db.session.get(Job, 'fresh').status, Job.RUNNING)
+
+    def test_recover_fresh_orphan_of_dead_local_process(self):
+        # A process of this host that has exited, as after a crash
+        process = subprocess.Popen([sys.executable, '-c', 'pass'])
+        process.wait()
+
+        with self.app.app_context():
+            orphan = Job(id='orphan', job_type='test-echo', status=Job.RUNNING,
+                         owner=f'{socket.gethostname()}:{process.pid}')
+            live = Job(id='live', job_type='test-echo', status=Job.RUNNING,
+                       owner=f'{socket.gethostname()}:{os.getppid()}')
+            db.session.add_all([orphan, live])
+            db.session.commit()
+
+            self.assertEqual(self.runner.recover_stale_jobs(), 1)
+            self.assertEqual(db.session.get(Job, 'orphan').status, Job.INTERRUPTED)
+            self.assertEqual(db.session.get(Job, 'live').status, Job.RUNNING)
+
+    def test_heartbeat_keeps_own_jobs_alive(self):
+        job_id = self.submit('test-blocking').get_json()["id"]
+        self.wait_for(job_id, (Job.RUNNING,))
+
+        with self.app.app_context():
+            job = db.session.get(Job, job_id)
+            job.heartbeat_at = utcnow() - timedelta(hours=1)
+            db.session.commit()
+
+            self.runner.beat()
+            self.assertEqual(self.runner.recover_stale_jobs(), 0)
+            self.assertEqual(db.session.get(Job, job_id).status, Job.RUNNING)
+
+    def test_run_finishes_job_cancelled_while_starting(self):
+        with self.app.app_context():
+            job = Job(id='starting', job_type='test-echo', cancel_requested=True,
+                      owner=self.runner.owner)
+            db.session.add(job)
+            db.session.commit()
+
+        self.runner._run('starting', echo_job, {"value": 1})
+
+        with self.app.app_context():
+            self.assertEqual(db.session.get(Job, 'starting').status, Job.CANCELLED)
+
+    def test_jobs_disabled_by_default(self):
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{self.db_path}'})
+        self.assertIsNone(get_job_runner(app))
+        response = app.test_client().get('/api/jobs/missing')
+        self.assertEqual(response.status_code, 503)
+
+    def test_category_scan_is_registered(self):
+        self.assertIn('category-scan', JOB_TYPES)
+
+    @patch('requests.get')
+    @patch('app.utils.job_utils.fetch_audio_files_from_category')
+    def test_propose_audio_links(self, mock_fetch_files, mock_get):
+        mock_fetch_files.return_value = [{'file': 'LL-Q188 (deu)-Jan-Luc-Weg.wav'}]
+        mock_get.return_value = MagicMock(status_code=200, headers={})
+        mock_get.return_value.json.return_value = {
+            "entities": {
+                "L1": {
+                    "id": "L1",
+                    "language": "Q188",
+                    "forms": [{"id": "L1-F1", "representations": {"de": {"language": "de", "value": "Weg"}}}]
+                }
+            }
+        }
+
+        response = self.submit('propose-audio-links', {
+            "categories": ["Lingua Libre pronunciation-deu"],
+            "lexeme_ids": ["L1"],
+        })
+        self.assertEqual(response.status_code, 202)
+        data = self.wait_for(response.get_json()["id"])
+
+        self.assertEqual(data["status"], Job.COMPLETED)
+        self.assertEqual(data["result"], [{
+            "lexeme_id": "L1",
+            "form_id": "L1-F1",
+            "language": "de",
+            "representation": "Weg",
+            "files": ["LL-Q188 (deu)-Jan-Luc-Weg.wav"],
+        }])
+        self.assertEqual(self.submit('propose-audio-links', {
+            "categories": ["Lingua Libre pronunciation-deu"],
+            "lexeme_ids": "L1",
+        }).status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
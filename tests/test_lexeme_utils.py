@@ -6,6 +6,7 @@ It tests both the utility functions and the API endpoints.
 """
 
 import unittest
+import requests
 from unittest.mock import patch, MagicMock
 from app.utils.lexeme_utils import sanitize_word, search_lexemes
 from app.routes import search_lexemes_route, main_bp
@@ -89,6 +90,119 @@ class TestLexemeUtils(unittest.TestCase):
         # Verify error handling
         self.assertEqual(results, [])
 
+    @patch('requests.get')
+    def test_search_lexemes_include_forms_and_audio(self, mock_get):
+        """
+        Test lexeme search with forms and audio included.
+        
+        Verifies that:
+        1. Forms are fetched with a single batched wbgetentities request
+        2. Forms use the get_lexeme_forms format
+        3. Pronunciation files are listed per form
+        """
+        search_response = MagicMock()
+        search_response.json.return_value = {
+            "results": {
+                "bindings": [
+                    {
+                        "lexeme": {"value": "http://www.wikidata.org/entity/L123"},
+                        "lemma": {"value": "hello"},
+                        "languageLabel": {"value": "English"}
+                    },
+                    {
+                        "lexeme": {"value": "http://www.wikidata.org/entity/L456"},
+                        "lemma": {"value": "hello"},
+                        "languageLabel": {"value": "German"}
+                    }
+                ]
+            }
+        }
+        entities_response = MagicMock()
+        entities_response.json.return_value = {
+            "entities": {
+                "L123": {
+                    "forms": [
+                        {
+                            "id": "L123-F1",
+                            "representations": {"en": {"language": "en", "value": "hello"}},
+                            "grammaticalFeatures": ["Q110786"],
+                            "statements": {
+                                "P443": [
+                                    {"mainsnak": {"datavalue": {"value": "LL-Q1860 (eng)-Jane-hello.wav"}}}
+                                ]
+                            }
+                        }
+                    ]
+                },
+                "L456": {"forms": []}
+            }
+        }
+        mock_get.side_effect = [search_response, entities_response]
+
+        results = search_lexemes("hello", include=["forms", "audio"])
+
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(mock_get.call_args.kwargs["params"]["ids"], "L123|L456")
+        self.assertEqual(results[0]["forms"][0]["form_id"], "L123-F1")
+        self.assertEqual(results[0]["forms"][0]["grammatical_features"], ["Q110786"])
+        self.assertEqual(results[0]["audio"], {"L123-F1": ["LL-Q1860 (eng)-Jane-hello.wav"]})
+        self.assertEqual(results[1]["forms"], [])
+        self.assertEqual(results[1]["audio"], {})
+
+    @patch('requests.get')
+    def test_search_lexemes_include_keeps_results_on_error(self, mock_get):
+        """
+        Test that a failed forms request keeps the search results.
+        
+        Verifies that the lexemes found by the SPARQL query are returned with
+        forms and audio marked as unavailable.
+        """
+        search_response = MagicMock()
+        search_response.json.return_value = {
+            "results": {
+                "bindings": [
+                    {
+                        "lexeme": {"value": "http://www.wikidata.org/entity/L123"},
+                        "lemma": {"value": "hello"},
+                        "languageLabel": {"value": "English"}
+                    }
+                ]
+            }
+        }
+        mock_get.side_effect = [search_response, requests.ConnectionError("API Error")]
+
+        results = search_lexemes("hello", include=["forms", "audio"])
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["id"], "L123")
+        self.assertIsNone(results[0]["forms"])
+        self.assertIsNone(results[0]["audio"])
+
+    @patch('requests.get')
+    def test_search_lexemes_without_include(self, mock_get):
+        """
+        Test that no forms are fetched unless requested.
+        """
+        mock_response = MagicMock()
+        mock_response.json.return_value = {
+            "results": {
+                "bindings": [
+                    {
+                        "lexeme": {"value": "http://www.wikidata.org/entity/L123"},
+                        "lemma": {"value": "hello"},
+                        "languageLabel": {"value": "English"}
+                    }
+                ]
+            }
+        }
+        mock_get.return_value = mock_response
+
+        results = search_lexemes("hello")
+
+        mock_get.assert_called_once()
+        self.assertNotIn("forms", results[0])
+        self.assertNotIn("audio", results[0])
+
 class TestLexemeAPI(unittest.TestCase):
     """
     Test cases for the lexeme search API endpoint.
@@ -150,5 +264,19 @@ class TestLexemeAPI(unittest.TestCase):
         data = response.get_json()
         self.assertEqual(data["error"], "Word parameter is required")
 
+    @patch('app.routes.search_lexemes')
+    def test_search_lexemes_endpoint_include(self, mock_search):
+        """
+        Test that the include parameter is parsed and validated.
+        """
+        mock_search.return_value = []
+
+        response = self.client.get('/api/search-lexemes?word=hello&include=forms,audio')
+        self.assertEqual(response.status_code, 200)
+        mock_search.assert_called_once_with("hello", ["forms", "audio"])
+
+        response = self.client.get('/api/search-lexemes?word=hello&include=senses')
+        self.assertEqual(response.status_code, 400)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file